@@ -5,11 +5,167 @@ This module contains functions for loading, cleaning, and preprocessing
 the retail customer data.
 """
 
+import mmap
+import os
+
 import pandas as pd
 import numpy as np
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from crick import TDigest
+    CRICK_AVAILABLE = True
+except ImportError:
+    CRICK_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Column size above which get_summary_statistics sketches the quartiles
+APPROX_QUANTILE_THRESHOLD = 10_000_000
+
+# Direct I/O settings for load_data(direct_io=True): smallest file worth
+# bypassing the page cache for, read size per call, and buffer alignment
+_DIRECT_IO_MIN_SIZE = 64 * 1024 ** 2
+_DIRECT_IO_CHUNK_SIZE = 16 * 1024 ** 2
+_DIRECT_IO_ALIGNMENT = 4096
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _central_moments(values):
+        """Return (n, mean, M2, M3, M4) in one pass using the online update."""
+        n = 0
+        mean = 0.0
+        m2 = 0.0
+        m3 = 0.0
+        m4 = 0.0
+        for x in values:
+            n1 = n
+            n += 1
+            delta = x - mean
+            delta_n = delta / n
+            delta_n2 = delta_n * delta_n
+            term1 = delta * delta_n * n1
+            mean += delta_n
+            m4 += term1 * delta_n2 * (n * n - 3 * n + 3) + 6 * delta_n2 * m2 - 4 * delta_n * m3
+            m3 += term1 * delta_n * (n - 2) - 3 * delta_n * m2
+            m2 += term1
+        return n, mean, m2, m3, m4
+else:
+    def _central_moments(values):
+        """Return (n, mean, M2, M3, M4), the sums of powered deviations."""
+        mean = values.mean() if values.size else 0.0
+        dev = values - mean
+        dev2 = dev * dev
+        return values.size, mean, dev2.sum(), (dev2 * dev).sum(), (dev2 * dev2).sum()
+
+
+def _shrink_dtypes(df, category_ratio=0.5, streaming=False):
+    """
+    Downcast numeric columns and convert low-cardinality text to category.
+    
+    Integers are narrowed to the smallest signed type, and floats become
+    float32 only when every value round-trips exactly. Chunks of a stream
+    skip the category conversion, since categories would differ between
+    chunks.
+    """
+    shrunk = {}
+    
+    for col in df.select_dtypes(include=[np.number]).columns:
+        series = df[col]
+        if pd.api.types.is_integer_dtype(series):
+            shrunk[col] = pd.to_numeric(series, downcast='integer')
+        elif series.dtype == np.float64:
+            values = series.to_numpy()
+            narrowed = values.astype(np.float32)
+            if np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+                shrunk[col] = pd.Series(narrowed, index=series.index, name=series.name)
+    
+    if not streaming and len(df):
+        # Covers object columns as well as pandas string dtypes
+        for col, series in df.items():
+            if (pd.api.types.is_string_dtype(series.dtype)
+                    and series.nunique() / len(df) <= category_ratio):
+                shrunk[col] = series.astype('category')
+    
+    # Replace columns on a shallow copy; unlike assign(**...), this also
+    # works for non-string column labels
+    df_shrunk = df.copy(deep=False)
+    for col, series in shrunk.items():
+        df_shrunk[col] = series
+    
+    return df_shrunk
+
 
-def load_data(filepath):
+def _read_direct(filepath):
+    """Read a whole file with O_DIRECT into a page-aligned buffer."""
+    size = os.path.getsize(filepath)
+    padded_size = -(-size // _DIRECT_IO_ALIGNMENT) * _DIRECT_IO_ALIGNMENT
+    # Anonymous mappings are page aligned, as O_DIRECT requires
+    buffer = memoryview(mmap.mmap(-1, max(padded_size, _DIRECT_IO_ALIGNMENT)))
+    
+    fd = os.open(filepath, os.O_RDONLY | os.O_DIRECT)
+    try:
+        offset = 0
+        while offset < size:
+            read = os.preadv(fd, [buffer[offset:offset + _DIRECT_IO_CHUNK_SIZE]], offset)
+            if read == 0:
+                break
+            offset += read
+    finally:
+        os.close(fd)
+    
+    return buffer[:offset]
+
+
+def _read_csv(filepath, engine='c', direct_io=False):
+    """Read a CSV with the requested parser, falling back to the C parser."""
+    use_pyarrow = engine == 'pyarrow' or (engine == 'auto' and PYARROW_AVAILABLE)
+    
+    if direct_io and PYARROW_AVAILABLE and hasattr(os, 'O_DIRECT'):
+        try:
+            if os.path.getsize(filepath) >= _DIRECT_IO_MIN_SIZE:
+                buffer = pa.py_buffer(_read_direct(filepath))
+                table = pa_csv.read_csv(pa.BufferReader(buffer))
+                return table.to_pandas()
+        except (OSError, ValueError, pa.ArrowException):
+            # Filesystems without O_DIRECT support and any pyarrow read or
+            # conversion error fall through to the normal reader
+            pass
+    
+    if use_pyarrow:
+        try:
+            # NumPy-backed output, so integer columns with blanks still load
+            # as float64 with NaN
+            return pd.read_csv(filepath, engine='pyarrow')
+        except (ImportError, ValueError):
+            # pyarrow missing, or options the pyarrow parser rejects
+            if engine == 'pyarrow':
+                raise
+    
+    # Infer dtypes from the whole file rather than chunk by chunk
+    return pd.read_csv(filepath, engine='c', low_memory=False)
+
+
+def _iter_chunks(reader, shrink):
+    """Yield chunks from a chunked CSV reader, optionally downcast."""
+    with reader:
+        for chunk in reader:
+            yield _shrink_dtypes(chunk, streaming=True) if shrink else chunk
+
+
+def load_data(filepath, shrink=False, engine='c', direct_io=False, chunksize=None):
     """
     Load data from CSV file.
     
@@ -17,14 +173,51 @@ def load_data(filepath):
     ----------
     filepath : str
         Path to the CSV file
+    shrink : bool, default=False
+        Opt in to a smaller memory footprint: downcast integer columns to
+        the narrowest signed dtype that holds their values, store floats
+        as float32 when that is exact, and store low-cardinality text
+        columns as category. Arithmetic on narrowed integer columns wraps
+        at their new width (an int8 column times another overflows past
+        127), so cast to int64 before such operations.
+    engine : str, default='c'
+        CSV parser ('c', 'pyarrow' or 'auto'). 'pyarrow' opts in to the
+        multithreaded pyarrow parser; 'auto' uses it when pyarrow is
+        installed and the C parser otherwise. Columns are NumPy-backed
+        either way, but pyarrow infers dates: timestamp text such as
+        '2010-12-01 08:26:00' loads as datetime64 and bare dates such as
+        '2024-01-01' as datetime.date objects, where the C parser keeps
+        both as strings.
+    direct_io : bool, default=False
+        On Linux, read files of 64 MiB or more with O_DIRECT in large
+        aligned chunks, bypassing the page cache, and parse the buffer with
+        pyarrow whatever the engine (with the same date inference as
+        engine='pyarrow'). Helps cold-cache loads of very large files;
+        falls back to the regular reader on any I/O or parse failure.
+    chunksize : int, optional
+        Stream the file in chunks of this many rows instead of loading it
+        whole. Chunks are read with the C parser, so engine must be 'c'
+        and direct_io False; `shrink` skips the category conversion so
+        that chunks stay consistent.
         
     Returns
     -------
-    pd.DataFrame
-        Loaded dataframe
+    pd.DataFrame or iterator of pd.DataFrame
+        Loaded dataframe, or an iterator of chunks when chunksize is set
     """
+    if chunksize is not None and (engine != 'c' or direct_io):
+        raise ValueError("chunksize streams with the C parser; it cannot be combined "
+                         "with engine='pyarrow'/'auto' or direct_io=True")
+    
     try:
-        df = pd.read_csv(filepath)
+        if chunksize is not None:
+            reader = pd.read_csv(filepath, chunksize=chunksize, low_memory=False)
+            print(f"Streaming data in chunks of {chunksize} rows")
+            return _iter_chunks(reader, shrink)
+        
+        df = _read_csv(filepath, engine, direct_io)
+        if shrink:
+            df = _shrink_dtypes(df)
         print(f"Data loaded successfully: {df.shape[0]} rows, {df.shape[1]} columns")
         return df
     except FileNotFoundError:
@@ -35,25 +228,107 @@ def load_data(filepath):
         return None
 
 
-def check_data_quality(df):
+def _is_arrow_backed(series):
+    """Check whether a series stores its values in a pyarrow array."""
+    dtype = series.dtype
+    return (isinstance(dtype, getattr(pd, 'ArrowDtype', ()))
+            or getattr(dtype, 'storage', None) in ('pyarrow', 'pyarrow_numpy'))
+
+
+def _missing_value_counts(df):
+    """Count missing values per column without building a boolean frame."""
+    counts = [
+        # Arrow keeps a null count alongside each array's validity bitmap
+        series.array.__arrow_array__().null_count if _is_arrow_backed(series)
+        else series.isna().sum()
+        for _, series in df.items()
+    ]
+    return pd.Series(counts, index=df.columns, dtype='int64')
+
+
+def _row_hashes(df):
+    """Hash every row, widening numeric columns so chunks hash consistently."""
+    # A column can be int8 in one chunk and float64 (because of NaN) in the
+    # next, so every numeric column is hashed as float64
+    numeric = df.select_dtypes(include=[np.number]).columns
+    widened = df.astype({col: np.float64 for col in numeric})
+    return pd.util.hash_pandas_object(widened, index=False).to_numpy()
+
+
+def _common_dtype(a, b):
+    """Smallest dtype that can hold values of both dtypes."""
+    if a == b:
+        return a
+    if isinstance(a, np.dtype) and isinstance(b, np.dtype):
+        return np.result_type(a, b)
+    return np.dtype(object)
+
+
+def check_data_quality(df, duplicates=True):
     """
     Perform initial data quality checks.
     
     Parameters
     ----------
-    df : pd.DataFrame
-        Input dataframe
+    df : pd.DataFrame or iterator of pd.DataFrame
+        Input dataframe, or chunks from load_data(chunksize=...). Chunks
+        are folded one at a time, and each column's dtype is the common
+        dtype over all chunks. Duplicates are counted across chunks from
+        64-bit row hashes, which needs 8 bytes per distinct row (about
+        8 GB for a billion distinct rows).
+    duplicates : bool, default=True
+        Count duplicate rows; pass False to keep memory flat on very large
+        streams, in which case 'duplicates' is reported as None
         
     Returns
     -------
     dict
         Dictionary containing quality metrics
     """
+    if isinstance(df, pd.DataFrame):
+        return {
+            'shape': df.shape,
+            'missing_values': _missing_value_counts(df),
+            'duplicates': df.duplicated().sum() if duplicates else None,
+            'dtypes': df.dtypes
+        }
+    
+    rows = 0
+    missing_values = None
+    dtypes = None
+    seen = np.empty(0, dtype=np.uint64)
+    pending = []
+    pending_size = 0
+    
+    for chunk in df:
+        rows += len(chunk)
+        counts = _missing_value_counts(chunk)
+        missing_values = counts if missing_values is None else missing_values + counts
+        # Chunks can be downcast to different widths; report the widest
+        if dtypes is None:
+            dtypes = chunk.dtypes
+        else:
+            dtypes = pd.Series([_common_dtype(a, b) for a, b in zip(dtypes, chunk.dtypes)],
+                               index=dtypes.index)
+        
+        if duplicates:
+            # Keep only distinct hashes, folding pending chunks into the
+            # sorted set once they outgrow it so merging stays amortized
+            chunk_hashes = np.unique(_row_hashes(chunk))
+            pending.append(chunk_hashes)
+            pending_size += chunk_hashes.size
+            if pending_size > seen.size:
+                seen = np.unique(np.concatenate([seen] + pending))
+                pending, pending_size = [], 0
+    
+    if pending:
+        seen = np.unique(np.concatenate([seen] + pending))
+    
     quality_report = {
-        'shape': df.shape,
-        'missing_values': df.isnull().sum(),
-        'duplicates': df.duplicated().sum(),
-        'dtypes': df.dtypes
+        'shape': (rows, len(dtypes) if dtypes is not None else 0),
+        'missing_values': missing_values,
+        'duplicates': rows - seen.size if duplicates else None,
+        'dtypes': dtypes
     }
     
     return quality_report
@@ -73,18 +348,20 @@ def handle_missing_values(df, strategy='drop'):
     Returns
     -------
     pd.DataFrame
-        Dataframe with missing values handled
+        New dataframe with missing values handled; the input is not modified
     """
-    df_clean = df.copy()
-    
+    # dropna and fillna return new frames, so no defensive copy is needed.
+    # fillna with a Series only fills the columns it is indexed by.
     if strategy == 'drop':
-        df_clean = df_clean.dropna()
+        df_clean = df.dropna()
     elif strategy == 'fill_mean':
-        numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
-        df_clean[numeric_cols] = df_clean[numeric_cols].fillna(df_clean[numeric_cols].mean())
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        df_clean = df.fillna(df[numeric_cols].mean())
     elif strategy == 'fill_median':
-        numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
-        df_clean[numeric_cols] = df_clean[numeric_cols].fillna(df_clean[numeric_cols].median())
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        df_clean = df.fillna(df[numeric_cols].median())
+    else:
+        df_clean = df.copy()
     
     print(f"Missing values handled using '{strategy}' strategy")
     return df_clean
@@ -110,17 +387,22 @@ def detect_outliers(df, column, method='iqr', threshold=1.5):
     pd.Series
         Boolean series indicating outliers
     """
+    values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    
     if method == 'iqr':
-        Q1 = df[column].quantile(0.25)
-        Q3 = df[column].quantile(0.75)
+        # Both quartiles from a single partition of the column
+        Q1, Q3 = np.nanquantile(values, [0.25, 0.75])
         IQR = Q3 - Q1
         lower_bound = Q1 - threshold * IQR
         upper_bound = Q3 + threshold * IQR
-        outliers = (df[column] < lower_bound) | (df[column] > upper_bound)
+        outliers = pd.Series((values < lower_bound) | (values > upper_bound), index=df.index)
     
     elif method == 'zscore':
-        z_scores = np.abs((df[column] - df[column].mean()) / df[column].std())
-        outliers = z_scores > 3
+        # Build the z-scores in one buffer instead of a temporary per step
+        z_scores = np.subtract(values, np.nanmean(values))
+        np.fabs(z_scores, out=z_scores)
+        z_scores /= np.nanstd(values, ddof=1)
+        outliers = pd.Series(z_scores > 3, index=df.index)
     
     print(f"Found {outliers.sum()} outliers in '{column}' using {method} method")
     return outliers
@@ -140,10 +422,9 @@ def create_age_bins(df, age_column='Age'):
     Returns
     -------
     pd.DataFrame
-        Dataframe with age bins added
+        New dataframe with a categorical Age_Group column added; the input
+        is not modified
     """
-    df_copy = df.copy()
-    
     # Define age bin mapping (adjust based on your data format)
     age_mapping = {
         '0-17': '0-17',
@@ -155,9 +436,22 @@ def create_age_bins(df, age_column='Age'):
         '55+': '51+'
     }
     
-    df_copy['Age_Group'] = df_copy[age_column].map(age_mapping)
+    # Remap the category dictionary rather than every row. Several source
+    # bins share a group, so the categories cannot simply be renamed; the
+    # row codes are translated through a per-category lookup table instead.
+    ages = df[age_column]
+    if not isinstance(ages.dtype, pd.CategoricalDtype):
+        ages = ages.astype(pd.CategoricalDtype(list(age_mapping)))
+    
+    groups = list(dict.fromkeys(age_mapping.values()))
+    group_codes = {group: code for code, group in enumerate(groups)}
+    # Trailing -1 makes missing codes (-1) map to missing again
+    lookup = np.array([group_codes.get(age_mapping.get(cat), -1)
+                       for cat in ages.cat.categories] + [-1])
     
-    return df_copy
+    age_groups = pd.Categorical.from_codes(lookup[ages.cat.codes.to_numpy()], categories=groups)
+    
+    return df.assign(Age_Group=pd.Series(age_groups, index=df.index))
 
 
 def convert_categorical(df, columns):
@@ -174,44 +468,142 @@ def convert_categorical(df, columns):
     Returns
     -------
     pd.DataFrame
-        Dataframe with converted columns
+        New dataframe with converted columns; the input is not modified
     """
-    df_copy = df.copy()
+    existing = set(df.columns)
     
-    for col in columns:
-        if col in df_copy.columns:
-            df_copy[col] = df_copy[col].astype('category')
+    return df.astype({col: 'category' for col in columns if col in existing})
+
+
+def _sorted_quantile(sorted_values, q):
+    """Linearly interpolated quantile of an already sorted array."""
+    if sorted_values.size == 0:
+        return np.nan
+    pos = q * (sorted_values.size - 1)
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, sorted_values.size - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def _moment_statistics(n, mean, m2, m3, m4):
+    """Sample std, skewness and excess kurtosis with pandas' bias corrections."""
+    std = np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+    
+    if n < 3:
+        skewness = np.nan
+    elif m2 == 0:
+        skewness = 0.0
+    else:
+        skewness = (n * (n - 1) ** 0.5 / (n - 2)) * (m3 / m2 ** 1.5)
+    
+    if n < 4:
+        kurtosis = np.nan
+    elif m2 == 0:
+        kurtosis = 0.0
+    else:
+        adj = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        kurtosis = n * (n + 1) * (n - 1) * m4 / ((n - 2) * (n - 3) * m2 ** 2) - adj
     
-    return df_copy
+    return std, skewness, kurtosis
 
 
-def get_summary_statistics(df, column):
+def _merge_moments(a, b):
+    """Combine two (n, mean, M2, M3, M4) tuples from disjoint partitions."""
+    n_a, mean_a, m2_a, m3_a, m4_a = a
+    n_b, mean_b, m2_b, m3_b, m4_b = b
+    if n_a == 0:
+        return b
+    if n_b == 0:
+        return a
+    
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    delta_n = delta / n
+    mean = mean_a + n_b * delta_n
+    m2 = m2_a + m2_b + delta * delta_n * n_a * n_b
+    m3 = (m3_a + m3_b + delta * delta_n ** 2 * n_a * n_b * (n_a - n_b)
+          + 3 * delta_n * (n_a * m2_b - n_b * m2_a))
+    m4 = (m4_a + m4_b + delta * delta_n ** 3 * n_a * n_b * (n_a * n_a - n_a * n_b + n_b * n_b)
+          + 6 * delta_n ** 2 * (n_a * n_a * m2_b + n_b * n_b * m2_a)
+          + 4 * delta_n * (n_a * m3_b - n_b * m3_a))
+    return n, mean, m2, m3, m4
+
+
+def get_summary_statistics(df, column, approx=None):
     """
     Get comprehensive summary statistics for a column.
     
+    The column is scanned once for the moments (mean, std, skewness,
+    kurtosis). The quartiles come either from one sort of the column or,
+    with `approx`, from a t-digest sketch built in a single pass; sketched
+    quartiles are approximate (typically well under 1% rank error), while
+    min and max stay exact.
+    
     Parameters
     ----------
-    df : pd.DataFrame
-        Input dataframe
+    df : pd.DataFrame or iterator of pd.DataFrame
+        Input dataframe, or chunks from load_data(chunksize=...). Moments
+        and sketches are merged across chunks in constant memory. Exact
+        quartiles (approx=False, or crick not installed) keep every
+        non-missing value of the column as float64, i.e. 8 bytes per row,
+        so use the sketch for very large streams.
     column : str
         Column name
+    approx : bool, optional
+        Use a t-digest for the quartiles (requires the `crick` package).
+        By default a sketch is used when crick is installed and the input
+        is a stream or has more than APPROX_QUANTILE_THRESHOLD rows.
         
     Returns
     -------
     dict
         Dictionary of summary statistics
     """
+    streaming = not isinstance(df, pd.DataFrame)
+    
+    if approx is None:
+        approx = CRICK_AVAILABLE and (streaming or len(df) > APPROX_QUANTILE_THRESHOLD)
+    elif approx and not CRICK_AVAILABLE:
+        raise ImportError("approx=True requires the 'crick' package")
+    
+    moments = (0, 0.0, 0.0, 0.0, 0.0)
+    digest = TDigest() if approx else None
+    parts = []
+    
+    for chunk in (df if streaming else [df]):
+        values = chunk[column].dropna().to_numpy(dtype=np.float64)
+        moments = _merge_moments(moments, _central_moments(values))
+        if approx:
+            digest.update(values)
+        else:
+            parts.append(values)
+    
+    n, mean, m2, m3, m4 = moments
+    std, skewness, kurtosis = _moment_statistics(n, mean, m2, m3, m4)
+    
+    if n == 0:
+        vmin = q1 = median = q3 = vmax = np.nan
+    elif approx:
+        q1, median, q3 = digest.quantile([0.25, 0.5, 0.75])
+        vmin, vmax = digest.min(), digest.max()
+    else:
+        values = np.concatenate(parts)
+        values.sort()
+        # Read the extremes directly; interpolating would turn +/-inf into NaN
+        vmin, vmax = values[0], values[-1]
+        q1, median, q3 = (_sorted_quantile(values, q) for q in (0.25, 0.5, 0.75))
+    
     stats = {
-        'count': df[column].count(),
-        'mean': df[column].mean(),
-        'median': df[column].median(),
-        'std': df[column].std(),
-        'min': df[column].min(),
-        'max': df[column].max(),
-        'q1': df[column].quantile(0.25),
-        'q3': df[column].quantile(0.75),
-        'skewness': df[column].skew(),
-        'kurtosis': df[column].kurtosis()
+        'count': n,
+        'mean': mean if n else np.nan,
+        'median': median,
+        'std': std,
+        'min': vmin,
+        'max': vmax,
+        'q1': q1,
+        'q3': q3,
+        'skewness': skewness,
+        'kurtosis': kurtosis
     }
     
     return stats
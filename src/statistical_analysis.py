@@ -5,10 +5,78 @@ This module contains functions for statistical inference including
 confidence intervals and hypothesis testing.
 """
 
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 from scipy import stats
 
+try:
+    from numba import get_num_threads, njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Maximum number of random values held in memory by the sampling helpers
+_BOOTSTRAP_BLOCK_SIZE = 2 ** 22
+
+# Statistics with a compiled bootstrap kernel, mapped to kernel codes;
+# the NumPy path reduces these along axis=1 of each resample block
+_NUMBA_STATISTICS = {np.mean: 0, np.median: 1, np.std: 2}
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _bootstrap_numba(data, num_bootstrap, statistic_code, seed):
+        """Compute bootstrap replicates in parallel, one replicate per thread."""
+        n = data.size
+        out = np.empty(num_bootstrap)
+        for i in prange(num_bootstrap):
+            # Seeding per replicate gives each one a fixed stream, whichever
+            # thread happens to run it
+            np.random.seed(seed + i)
+            sample = np.empty(n)
+            for j in range(n):
+                sample[j] = data[np.random.randint(0, n)]
+            if statistic_code == 0:
+                out[i] = sample.mean()
+            elif statistic_code == 1:
+                out[i] = np.median(sample)
+            else:
+                out[i] = sample.std()
+        return out
+
+    @njit(cache=True)
+    def _mean_var(values):
+        """Return (n, mean, sample variance) from one pass over the data."""
+        n = values.size
+        mean = 0.0
+        m2 = 0.0
+        for i in range(n):
+            delta = values[i] - mean
+            mean += delta / (i + 1)
+            m2 += delta * (values[i] - mean)
+        return n, mean, m2 / (n - 1) if n > 1 else np.nan
+else:
+    def _mean_var(values):
+        """Return (n, mean, sample variance)."""
+        return values.size, values.mean(), values.var(ddof=1)
+
+
+def _get_rng(random_state):
+    """Build a Generator, seeded from the global NumPy state by default."""
+    if random_state is None:
+        # Keeps results reproducible under np.random.seed(...)
+        random_state = np.random.randint(0, 2 ** 32, dtype=np.int64)
+    return np.random.default_rng(random_state)
+
+
+@lru_cache(maxsize=1024)
+def _t_critical(n, confidence):
+    """Two-sided t critical value for a sample of size n, cached by (n, confidence)."""
+    return stats.t.ppf((1 + confidence) / 2, n - 1)
+
 
 def calculate_confidence_interval(data, confidence=0.95):
     """
@@ -26,12 +94,13 @@ def calculate_confidence_interval(data, confidence=0.95):
     tuple
         (mean, lower_bound, upper_bound, margin_of_error)
     """
-    n = len(data)
-    mean = np.mean(data)
-    std_err = stats.sem(data)
+    data = np.asarray(data, dtype=np.float64)
+    n = data.size
+    mean = data.mean()
+    std_err = data.std(ddof=1) / np.sqrt(n)
     
     # Calculate margin of error
-    margin = std_err * stats.t.ppf((1 + confidence) / 2, n - 1)
+    margin = std_err * _t_critical(n, confidence)
     
     lower_bound = mean - margin
     upper_bound = mean + margin
@@ -83,10 +152,14 @@ def confidence_interval_comparison(group1, group2, confidence=0.95):
     return results
 
 
-def sample_mean_distribution(population, sample_size, num_samples=1000):
+def sample_mean_distribution(population, sample_size, num_samples=1000,
+                             replace=False, random_state=None):
     """
     Demonstrate Central Limit Theorem by sampling from population.
     
+    Sample indices are collected into one (num_samples, sample_size)
+    matrix, and the means are taken with a single row-wise reduction.
+    
     Parameters
     ----------
     population : array-like
@@ -95,19 +168,37 @@ def sample_mean_distribution(population, sample_size, num_samples=1000):
         Size of each sample
     num_samples : int, default=1000
         Number of samples to draw
+    replace : bool, default=False
+        Whether to sample with replacement
+    random_state : int or np.random.Generator, optional
+        Seed or generator for reproducible sampling. By default the
+        generator is seeded from the global state, so np.random.seed(...)
+        still makes results reproducible.
         
     Returns
     -------
     np.ndarray
         Array of sample means
     """
-    sample_means = []
+    rng = _get_rng(random_state)
+    population = np.asarray(population)
+    n = population.size
+    
+    if replace:
+        samples = rng.choice(population, size=(num_samples, sample_size), replace=True)
+        return samples.mean(axis=1, dtype=np.float64)
     
-    for _ in range(num_samples):
-        sample = np.random.choice(population, size=sample_size, replace=False)
-        sample_means.append(np.mean(sample))
+    if sample_size > n:
+        raise ValueError("Cannot take a larger sample than population when 'replace=False'")
     
-    return np.array(sample_means)
+    # Generator.choice draws without replacement in O(sample_size) per row
+    # rather than permuting the whole population, so the work and memory
+    # do not grow with len(population)
+    idx = np.empty((num_samples, sample_size), dtype=np.intp)
+    for i in range(num_samples):
+        idx[i] = rng.choice(n, size=sample_size, replace=False)
+    
+    return population[idx].mean(axis=1, dtype=np.float64)
 
 
 def t_test_independent(group1, group2, alpha=0.05):
@@ -141,10 +232,39 @@ def t_test_independent(group1, group2, alpha=0.05):
     return results
 
 
-def bootstrap_confidence_interval(data, num_bootstrap=10000, confidence=0.95, statistic=np.mean):
+def _bootstrap_numpy(data_arr, num_bootstrap, statistic, rng):
+    """Compute bootstrap replicates from blocks of resampled index rows."""
+    n = data_arr.size
+    
+    # Bound the size of each resample matrix to keep memory use flat
+    rows_per_block = max(1, _BOOTSTRAP_BLOCK_SIZE // max(n, 1))
+    bootstrap_stats = np.empty(num_bootstrap)
+    
+    for start in range(0, num_bootstrap, rows_per_block):
+        stop = min(start + rows_per_block, num_bootstrap)
+        idx = rng.integers(0, n, size=(stop - start, n), dtype=np.intp)
+        resamples = data_arr[idx]
+        
+        if statistic in _NUMBA_STATISTICS:
+            bootstrap_stats[start:stop] = statistic(resamples, axis=1)
+        else:
+            bootstrap_stats[start:stop] = np.apply_along_axis(statistic, 1, resamples)
+    
+    return bootstrap_stats
+
+
+def bootstrap_confidence_interval(data, num_bootstrap=10000, confidence=0.95, statistic=np.mean,
+                                  random_state=None):
     """
     Calculate bootstrap confidence interval.
     
+    Resamples are drawn as blocks of index rows. np.mean, np.median and
+    np.std are reduced along each block in one call; any other statistic
+    is still called once per replicate. When numba is installed and has
+    more than one thread, np.mean, np.median and np.std use a parallel
+    compiled kernel instead; it is seeded the same way, but draws a
+    different random stream than the NumPy path.
+    
     Parameters
     ----------
     data : array-like
@@ -155,24 +275,33 @@ def bootstrap_confidence_interval(data, num_bootstrap=10000, confidence=0.95, st
         Confidence level
     statistic : callable, default=np.mean
         Statistic to calculate
+    random_state : int or np.random.Generator, optional
+        Seed or generator for reproducible resampling. By default the
+        resampling is seeded from the global state, so np.random.seed(...)
+        still applies.
         
     Returns
     -------
     tuple
         (statistic_value, lower_bound, upper_bound)
     """
-    bootstrap_stats = []
+    data_arr = np.asarray(data)
+    rng = _get_rng(random_state)
     
-    for _ in range(num_bootstrap):
-        sample = np.random.choice(data, size=len(data), replace=True)
-        bootstrap_stats.append(statistic(sample))
+    # On a single thread the compiled kernel is slower than the blocked
+    # NumPy path, so it is only worth dispatching to when it can fan out
+    if NUMBA_AVAILABLE and statistic in _NUMBA_STATISTICS and get_num_threads() > 1:
+        # numba seeds take 32-bit values; leave room for seed + i
+        seed = int(rng.integers(0, 2 ** 32 - num_bootstrap))
+        bootstrap_stats = _bootstrap_numba(np.ascontiguousarray(data_arr, dtype=np.float64),
+                                           num_bootstrap, _NUMBA_STATISTICS[statistic], seed)
+    else:
+        bootstrap_stats = _bootstrap_numpy(data_arr, num_bootstrap, statistic, rng)
     
     alpha = 1 - confidence
-    lower_percentile = (alpha / 2) * 100
-    upper_percentile = (1 - alpha / 2) * 100
     
-    lower_bound = np.percentile(bootstrap_stats, lower_percentile)
-    upper_bound = np.percentile(bootstrap_stats, upper_percentile)
+    # Both bounds from a single partition of the bootstrap distribution
+    lower_bound, upper_bound = np.quantile(bootstrap_stats, [alpha / 2, 1 - alpha / 2])
     stat_value = statistic(data)
     
     return stat_value, lower_bound, upper_bound
@@ -194,9 +323,8 @@ def effect_size_cohens_d(group1, group2):
     float
         Cohen's d effect size
     """
-    mean1, mean2 = np.mean(group1), np.mean(group2)
-    var1, var2 = np.var(group1, ddof=1), np.var(group2, ddof=1)
-    n1, n2 = len(group1), len(group2)
+    n1, mean1, var1 = _mean_var(np.ascontiguousarray(group1, dtype=np.float64))
+    n2, mean2, var2 = _mean_var(np.ascontiguousarray(group2, dtype=np.float64))
     
     # Pooled standard deviation
     pooled_std = np.sqrt(((n1 - 1) * var1 + (n2 - 1) * var2) / (n1 + n2 - 2))
@@ -255,7 +383,7 @@ def perform_anova(groups):
     return results
 
 
-def summary_statistics_by_group(df, group_column, value_column):
+def summary_statistics_by_group(df, group_column, value_column, sort=True):
     """
     Calculate summary statistics for each group.
     
@@ -267,13 +395,18 @@ def summary_statistics_by_group(df, group_column, value_column):
         Column to group by
     value_column : str
         Column to calculate statistics for
+    sort : bool, default=True
+        Order rows by group key; pass False to keep first-seen order and
+        skip sorting the keys
         
     Returns
     -------
     pd.DataFrame
-        Summary statistics by group
+        Summary statistics by group, with a row only for groups present
+        in the data
     """
-    summary = df.groupby(group_column)[value_column].agg([
+    # observed=True skips unused categories of categorical group columns
+    summary = df.groupby(group_column, observed=True, sort=sort)[value_column].agg([
         ('count', 'count'),
         ('mean', 'mean'),
         ('median', 'median'),
@@ -10,6 +10,15 @@ import seaborn as sns
 import numpy as np
 import pandas as pd
 
+try:
+    from KDEpy import FFTKDE
+    KDEPY_AVAILABLE = True
+except ImportError:
+    KDEPY_AVAILABLE = False
+
+
+# Sample size from which plot_distribution switches to the FFT-based KDE
+_FFT_KDE_MIN_SIZE = 10_000
 
 # Set style
 sns.set_style("whitegrid")
@@ -20,6 +29,10 @@ def plot_distribution(data, title="Distribution", xlabel="Value", bins=30, color
     """
     Plot histogram with KDE overlay.
     
+    Large samples use the FFT-based KDE from KDEpy when it is installed,
+    which bins the data once instead of evaluating every point against
+    every grid position.
+    
     Parameters
     ----------
     data : array-like
@@ -38,10 +51,18 @@ def plot_distribution(data, title="Distribution", xlabel="Value", bins=30, color
     ax.hist(data, bins=bins, color=color, alpha=0.7, edgecolor='black', density=True)
     
     # Add KDE
-    from scipy import stats
-    kde = stats.gaussian_kde(data)
-    x_range = np.linspace(data.min(), data.max(), 100)
-    ax.plot(x_range, kde(x_range), color='red', linewidth=2, label='KDE')
+    values = np.asarray(data, dtype=np.float64)
+    if KDEPY_AVAILABLE and values.size >= _FFT_KDE_MIN_SIZE:
+        x_range, density = FFTKDE(bw='silverman').fit(values).evaluate(1024)
+        # The FFT grid extends past the data; clip it to the histogram range
+        in_range = (x_range >= values.min()) & (x_range <= values.max())
+        x_range, density = x_range[in_range], density[in_range]
+    else:
+        from scipy import stats
+        kde = stats.gaussian_kde(values)
+        x_range = np.linspace(values.min(), values.max(), 100)
+        density = kde(x_range)
+    ax.plot(x_range, density, color='red', linewidth=2, label='KDE')
     
     ax.set_title(title, fontsize=14, fontweight='bold')
     ax.set_xlabel(xlabel, fontsize=12)
@@ -53,10 +74,51 @@ def plot_distribution(data, title="Distribution", xlabel="Value", bins=30, color
     return fig
 
 
-def plot_boxplot_by_group(df, group_col, value_col, title="Boxplot by Group"):
+def _boxplot_stats_by_group(df, group_col, value_col, whis=1.5):
+    """Compute matplotlib bxp statistics for every group from one sort."""
+    subset = df[[group_col, value_col]].dropna()
+    codes, labels = pd.factorize(subset[group_col], sort=True)
+    values = subset[value_col].to_numpy(dtype=np.float64)
+    
+    # Sort by group, then by value, so each group is a sorted slice
+    order = np.lexsort((values, codes))
+    values = values[order]
+    group_ends = np.cumsum(np.bincount(codes, minlength=len(labels)))
+    
+    box_stats = []
+    start = 0
+    for label, stop in zip(labels, group_ends):
+        group = values[start:stop]
+        start = stop
+        if group.size == 0:
+            continue
+        
+        q1, med, q3 = np.quantile(group, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        # Whiskers reach the most extreme values within whis * IQR
+        lo = np.searchsorted(group, q1 - whis * iqr, side='left')
+        hi = np.searchsorted(group, q3 + whis * iqr, side='right')
+        
+        box_stats.append({
+            'label': label,
+            'q1': q1,
+            'med': med,
+            'q3': q3,
+            'whislo': group[lo],
+            'whishi': group[hi - 1],
+            'fliers': np.concatenate([group[:lo], group[hi:]])
+        })
+    
+    return box_stats
+
+
+def plot_boxplot_by_group(df, group_col, value_col, title="Boxplot by Group", showfliers=True):
     """
     Create boxplot comparing groups.
     
+    Box statistics are computed from a single sort of the data and drawn
+    with matplotlib's bxp, so each group is not re-sorted for plotting.
+    
     Parameters
     ----------
     df : pd.DataFrame
@@ -67,10 +129,17 @@ def plot_boxplot_by_group(df, group_col, value_col, title="Boxplot by Group"):
         Column for values
     title : str
         Plot title
+    showfliers : bool, default=True
+        Whether to draw points beyond the whiskers; disable for very large
+        datasets to avoid drawing large numbers of markers
     """
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    sns.boxplot(data=df, x=group_col, y=value_col, ax=ax, palette='Set2')
+    box_stats = _boxplot_stats_by_group(df, group_col, value_col)
+    artists = ax.bxp(box_stats, positions=np.arange(len(box_stats)),
+                     patch_artist=True, showfliers=showfliers)
+    for box, color in zip(artists['boxes'], sns.color_palette('Set2', len(box_stats))):
+        box.set_facecolor(color)
     
     ax.set_title(title, fontsize=14, fontweight='bold')
     ax.set_xlabel(group_col, fontsize=12)
@@ -97,25 +166,21 @@ def plot_confidence_intervals(groups_data, group_names, confidence=0.95,
     title : str
         Plot title
     """
-    from src.statistical_analysis import calculate_confidence_interval
+    from scipy import stats
     
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    means = []
-    lower_bounds = []
-    upper_bounds = []
-    
-    for data in groups_data:
-        mean, lower, upper, _ = calculate_confidence_interval(data, confidence)
-        means.append(mean)
-        lower_bounds.append(lower)
-        upper_bounds.append(upper)
+    # Same intervals as calculate_confidence_interval, computed for all
+    # groups at once with a single vectorized t.ppf call
+    groups = [np.asarray(data, dtype=np.float64) for data in groups_data]
+    ns = np.array([group.size for group in groups])
+    means = np.array([group.mean() for group in groups])
+    std_errs = np.array([group.std(ddof=1) for group in groups]) / np.sqrt(ns)
+    margins = std_errs * stats.t.ppf((1 + confidence) / 2, ns - 1)
     
     x_pos = np.arange(len(group_names))
-    errors = [[m - l for m, l in zip(means, lower_bounds)],
-              [u - m for m, u in zip(means, upper_bounds)]]
     
-    ax.errorbar(x_pos, means, yerr=errors, fmt='o', markersize=10, 
+    ax.errorbar(x_pos, means, yerr=margins, fmt='o', markersize=10, 
                 capsize=10, capthick=2, linewidth=2, color='steelblue')
     
     ax.set_xticks(x_pos)
@@ -187,10 +252,22 @@ def plot_correlation_heatmap(df, columns=None, title="Correlation Heatmap"):
     title : str
         Plot title
     """
-    if columns:
-        corr_df = df[columns].corr()
+    numeric_df = df[columns] if columns else df.select_dtypes(include=[np.number])
+    
+    # One contiguous float32 block lets np.corrcoef run as a single matrix
+    # product; pandas' pairwise path is only needed to skip missing values
+    values = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+    if np.isnan(values).any():
+        corr_df = numeric_df.corr()
     else:
-        corr_df = df.select_dtypes(include=[np.number]).corr()
+        # Standardize in float64 first: large offsets such as epoch seconds
+        # would otherwise swamp float32 precision
+        centered = values - values.mean(axis=0)
+        scale = centered.std(axis=0)
+        scale[scale == 0] = 1
+        standardized = np.ascontiguousarray(centered / scale, dtype=np.float32)
+        corr = np.corrcoef(standardized, rowvar=False, dtype=np.float32)
+        corr_df = pd.DataFrame(corr, index=numeric_df.columns, columns=numeric_df.columns)
     
     fig, ax = plt.subplots(figsize=(10, 8))
     
@@ -238,6 +315,9 @@ def plot_multiple_distributions(data_dict, title="Distribution Comparison", bins
     """
     Plot multiple distributions on same axes.
     
+    All series share one set of bin edges, so the bars line up and the
+    counts are directly comparable.
+    
     Parameters
     ----------
     data_dict : dict
@@ -251,8 +331,20 @@ def plot_multiple_distributions(data_dict, title="Distribution Comparison", bins
     
     colors = plt.cm.Set2(np.linspace(0, 1, len(data_dict)))
     
-    for (label, data), color in zip(data_dict.items(), colors):
-        ax.hist(data, bins=bins, alpha=0.5, label=label, color=color, edgecolor='black')
+    # Like ax.hist, ignore NaN (and inf) when binning
+    series = {}
+    for label, data in data_dict.items():
+        data = np.asarray(data, dtype=np.float64)
+        series[label] = data[np.isfinite(data)]
+    
+    if series:
+        edges = np.histogram_bin_edges(np.concatenate(list(series.values())), bins=bins)
+        widths = np.diff(edges)
+        
+        for (label, data), color in zip(series.items(), colors):
+            counts, _ = np.histogram(data, bins=edges)
+            ax.bar(edges[:-1], counts, width=widths, align='edge', alpha=0.5,
+                   label=label, color=color, edgecolor='black')
     
     ax.set_title(title, fontsize=14, fontweight='bold')
     ax.set_xlabel('Value', fontsize=12)